@@ -0,0 +1,105 @@
+from functools import wraps
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound, PermissionDenied
+
+from .authentication import AsyncJWTAuthentication
+from .models import Room, Booking, Payment
+from .serializers import RoomSerializer, BookingSerializer, PaymentSerializer
+from .permissions import IsStaffOrReadOnly, IsBookingOwnerOrStaff, IsPaymentOwnerOrStaff
+from .validations import parse_search_dates, get_available_rooms
+
+# Async versions of the high-traffic read endpoints.
+# These are served under ASGI (homsapiproj/asgi.py) and use the async ORM.
+# The queries themselves still run on a thread via sync_to_async, but requests
+# waiting on the database do not each hold a worker. Writes stay on the DRF viewsets.
+
+authenticator = AsyncJWTAuthentication()
+
+
+def error_response(exc):
+    # Same payload shape as DRF's default exception handler
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {'detail': exc.detail}
+    response = JsonResponse(data, status=exc.status_code, safe=False)
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        response['WWW-Authenticate'] = authenticator.authenticate_header(None)
+    return response
+
+
+def async_api_view(permission_classes=()):
+    """
+    Wraps an async view that returns serializer data: authenticates the
+    JWT, checks the given DRF permission classes and renders JSON.
+    """
+    def decorator(view_func):
+        @require_GET
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                result = await authenticator.aauthenticate(request)
+                request.user = result[0] if result else AnonymousUser()
+
+                for permission_class in permission_classes:
+                    if not permission_class().has_permission(request, None):
+                        if not request.user.is_authenticated:
+                            raise NotAuthenticated()
+                        raise PermissionDenied()
+
+                data = await view_func(request, *args, **kwargs)
+            except APIException as exc:
+                return error_response(exc)
+            return JsonResponse(data, safe=False)
+        return wrapper
+    return decorator
+
+
+@async_api_view([IsStaffOrReadOnly])
+async def room_list(request):
+    rooms = [room async for room in Room.objects.all()]
+    return RoomSerializer(rooms, many=True).data
+
+
+@async_api_view([IsStaffOrReadOnly])
+async def room_detail(request, pk):
+    try:
+        room = await Room.objects.aget(pk=pk)
+    except Room.DoesNotExist:
+        raise NotFound("No Room matches the given query.")
+    return RoomSerializer(room).data
+
+
+@async_api_view([IsStaffOrReadOnly])
+async def room_availability_search(request):
+    check_in, check_out = parse_search_dates(request.GET)
+    queryset = get_available_rooms(check_in, check_out)
+
+    rooms = [room async for room in queryset]
+    return RoomSerializer(rooms, many=True).data
+
+
+@async_api_view([IsBookingOwnerOrStaff])
+async def my_bookings(request):
+    # select_related so the nested Room/Guest details do not trigger
+    # lazy (sync) queries while serializing
+    queryset = Booking.objects.select_related('Rid', 'Gid')
+    if not request.user.is_staff:
+        queryset = queryset.filter(Gid__User=request.user)
+
+    bookings = [booking async for booking in queryset]
+    return BookingSerializer(bookings, many=True).data
+
+
+@async_api_view([IsPaymentOwnerOrStaff])
+async def my_payments(request):
+    queryset = Payment.objects.select_related('Booking__Rid', 'Booking__Gid')
+    if not request.user.is_staff:
+        queryset = queryset.filter(Booking__Gid__User=request.user)
+
+    payments = [payment async for payment in queryset]
+    return PaymentSerializer(payments, many=True).data
@@ -0,0 +1,137 @@
+import json
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import ValidationError
+
+# Helpers for BatchView: each sub-request is dispatched straight to the
+# DRF view it resolves to, reusing the batch request's authenticated user.
+
+logger = logging.getLogger(__name__)
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Shared by all batches in the process and sized for several at once;
+# each batch uses at most BATCH_MAX_WORKERS of these threads.
+executor = ThreadPoolExecutor(max_workers=settings.BATCH_POOL_SIZE)
+
+
+def validate_batch(data):
+    sub_requests = data.get('requests') if isinstance(data, dict) else data
+    if not isinstance(sub_requests, list) or not sub_requests:
+        raise ValidationError("requests must be a non-empty list.")
+    if len(sub_requests) > settings.BATCH_MAX_REQUESTS:
+        raise ValidationError(f"A batch can contain at most {settings.BATCH_MAX_REQUESTS} requests.")
+
+    for sub in sub_requests:
+        if not isinstance(sub, dict) or not isinstance(sub.get('path'), str):
+            raise ValidationError("Each request needs a path.")
+        sub['method'] = str(sub.get('method', 'GET')).upper()
+        if sub['method'] not in BATCH_METHODS:
+            raise ValidationError(f"Unsupported method {sub['method']}.")
+    return sub_requests
+
+
+def build_sub_request(request, sub):
+    url = urlsplit(sub['path'])
+    body = b''
+    if sub.get('body') is not None:
+        body = json.dumps(sub['body']).encode()
+
+    environ = dict(request.META)
+    environ.update({
+        'REQUEST_METHOD': sub['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+    })
+    sub_request = WSGIRequest(environ)
+
+    # Authenticate once: DRF picks these up instead of decoding the JWT again,
+    # while each view still runs its own permission classes and throttles.
+    if request.user.is_authenticated:
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def dispatch_sub_request(request, sub):
+    try:
+        match = resolve(urlsplit(sub['path']).path)
+    except Resolver404:
+        match = None
+
+    # Only the synchronous DRF API views can be batched
+    view_class = getattr(match.func, 'cls', None) if match else None
+    if view_class is None or not match.route.startswith('api/') or not getattr(view_class, 'batchable', True):
+        return {'status': 404, 'body': {'detail': "Not found."}}
+
+    response = match.func(build_sub_request(request, sub), *match.args, **match.kwargs)
+    return {'status': response.status_code, 'body': getattr(response, 'data', None)}
+
+
+def run_sub_request(request, sub):
+    # A failing sub-request only fails its own entry, not the whole batch
+    try:
+        return dispatch_sub_request(request, sub)
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", sub['method'], sub['path'])
+        return {'status': 500, 'body': {'detail': "A server error occurred."}}
+
+
+def run_in_pool(request, sub):
+    # Pool threads never see request_started/finished, so recycle their
+    # DB connections the same way, honouring CONN_MAX_AGE
+    close_old_connections()
+    try:
+        return run_sub_request(request, sub)
+    finally:
+        close_old_connections()
+
+
+def run_reads(request, reads):
+    """
+    Runs GET sub-requests concurrently, at most BATCH_MAX_WORKERS at a time
+    for this batch, and returns their responses in order.
+    """
+    responses = [None] * len(reads)
+    waiting = list(enumerate(reads))[::-1]
+    running = {}
+    while waiting or running:
+        while waiting and len(running) < settings.BATCH_MAX_WORKERS:
+            index, sub = waiting.pop()
+            running[executor.submit(run_in_pool, request, sub)] = index
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            responses[running.pop(future)] = future.result()
+    return responses
+
+
+def run_batch(request, sub_requests):
+    """
+    Runs the sub-requests and returns their responses in order.
+    Consecutive GETs run concurrently; any other method waits for the
+    reads before it and runs on its own, so reads after a write see it.
+    """
+    responses = []
+    reads = []
+    for sub in sub_requests + [None]:
+        if sub is not None and sub['method'] == 'GET':
+            reads.append(sub)
+            continue
+        if len(reads) == 1:
+            responses.append(run_sub_request(request, reads[0]))
+        elif reads:
+            responses.extend(run_reads(request, reads))
+        reads = []
+        if sub is not None:
+            responses.append(run_sub_request(request, sub))
+    return responses
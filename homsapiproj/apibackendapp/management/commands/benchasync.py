@@ -0,0 +1,102 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Command(BaseCommand):
+    help = (
+        "In-process benchmark of a read endpoint: the sync DRF view through the "
+        "WSGI handler (fixed worker thread pool) against the async view through "
+        "the ASGI handler, with the same number of concurrent connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='rooms/',
+                            help="Endpoint below /api/ and /api/async/, e.g. rooms/, rooms/search/?... or bookings/my/")
+        parser.add_argument('--concurrency', type=int, default=500,
+                            help="Number of concurrent connections")
+        parser.add_argument('--requests', type=int, default=5000,
+                            help="Total number of requests per run")
+        parser.add_argument('--threads', type=int, default=32,
+                            help="WSGI worker threads for the sync run")
+        parser.add_argument('--user', help="Username to authenticate as (needed for */my/ endpoints)")
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+            headers['Authorization'] = f"Bearer {AccessToken.for_user(user)}"
+
+        sync_url = f"/api/{options['path']}"
+        async_url = f"/api/async/{options['path']}"
+
+        # The test clients send Host: testserver
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            runs = [
+                ('sync  / WSGI', asyncio.run(self.run_sync(sync_url, headers, options))),
+                ('async / ASGI', asyncio.run(self.run_async(async_url, headers, options))),
+            ]
+
+        self.stdout.write(
+            f"{options['requests']} requests, {options['concurrency']} concurrent connections, "
+            f"{options['threads']} WSGI threads"
+        )
+        for label, (elapsed, latencies, errors) in runs:
+            latencies.sort()
+            self.stdout.write(
+                f"{label}: {len(latencies) / elapsed:8.1f} req/s  "
+                f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+                f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.1f} ms  "
+                f"errors {errors}"
+            )
+
+    async def drive(self, send, options):
+        # Each connection issues its share of requests back to back,
+        # so latency includes the time spent waiting for a worker.
+        latencies = []
+        errors = 0
+
+        async def connection(count):
+            nonlocal errors
+            for _ in range(count):
+                started = time.perf_counter()
+                response = await send()
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        concurrency = options['concurrency']
+        per_connection, remainder = divmod(options['requests'], concurrency)
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            connection(per_connection + (1 if i < remainder else 0)) for i in range(concurrency)
+        ))
+        return time.perf_counter() - started, latencies, errors
+
+    async def run_sync(self, url, headers, options):
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            def get():
+                return Client().get(url, headers=headers)
+            return await self.drive(lambda: loop.run_in_executor(pool, get), options)
+
+    async def run_async(self, url, headers, options):
+        client = AsyncClient()
+
+        async def get():
+            # ASGIHandler runs each request in its own ThreadSensitiveContext;
+            # AsyncClient does not, which would put every ORM call on one thread
+            async with ThreadSensitiveContext():
+                return await client.get(url, headers=headers)
+        return await self.drive(get, options)
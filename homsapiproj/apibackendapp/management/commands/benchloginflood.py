@@ -0,0 +1,98 @@
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+# Users registered by the flood are deleted again afterwards
+FLOOD_PREFIX = 'benchflood_'
+
+
+class Command(BaseCommand):
+    help = (
+        "In-process load test: booking read latency on its own and while other "
+        "threads flood /api/auth/login/ and /api/auth/register/. Users the "
+        "flood manages to register are removed at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('user', help="Username whose bookings are read")
+        parser.add_argument('--requests', type=int, default=500,
+                            help="Booking requests per run")
+        parser.add_argument('--threads', type=int, default=8,
+                            help="Threads reading bookings")
+        parser.add_argument('--flood-threads', type=int, default=16,
+                            help="Threads sending login/register attempts during the second run")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+        headers = {'Authorization': f"Bearer {AccessToken.for_user(user)}"}
+
+        # The test client sends Host: testserver
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            baseline = self.run_bookings(headers, options)
+
+            stop = threading.Event()
+            statuses = Counter()
+            flooders = [
+                threading.Thread(target=self.flood, args=(stop, statuses, i))
+                for i in range(options['flood_threads'])
+            ]
+            for flooder in flooders:
+                flooder.start()
+            try:
+                during_flood = self.run_bookings(headers, options)
+            finally:
+                stop.set()
+                for flooder in flooders:
+                    flooder.join()
+                # Registrations that got past the throttles created real users
+                User.objects.filter(username__startswith=FLOOD_PREFIX).delete()
+
+        for label, latencies in (('bookings alone        ', baseline), ('bookings + auth flood ', during_flood)):
+            latencies.sort()
+            self.stdout.write(
+                f"{label}: p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+                f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.1f} ms"
+            )
+        for path, code in sorted(statuses):
+            self.stdout.write(f"flood {path}: {code} x {statuses[path, code]}")
+
+    def run_bookings(self, headers, options):
+        def get(_):
+            started = time.perf_counter()
+            response = Client().get('/api/bookings/my/', headers=headers)
+            if response.status_code != 200:
+                raise CommandError(f"Booking request failed with {response.status_code}")
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            return list(pool.map(get, range(options['requests'])))
+
+    def flood(self, stop, statuses, index):
+        # Half the threads try logins with a bad password, half register fresh
+        # usernames, so every request that gets past the throttles hashes
+        client = Client()
+        attempt = 0
+        while not stop.is_set():
+            attempt += 1
+            if index % 2 == 0:
+                path, data = '/api/auth/login/', {
+                    'username': f'{FLOOD_PREFIX}{index}', 'password': 'wrong-password'
+                }
+            else:
+                path, data = '/api/auth/register/', {
+                    'username': f'{FLOOD_PREFIX}{index}_{attempt}', 'password': 'flood-password',
+                    'email': f'{FLOOD_PREFIX}{index}_{attempt}@example.com'
+                }
+            response = client.post(path, data, content_type='application/json')
+            statuses[path, response.status_code] += 1
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def backfill_changes(apps, schema_editor):
+    # Rows that existed before the changes feed get a 'created' change,
+    # so a client syncing from cursor 0 receives them
+    Room = apps.get_model('apibackendapp', 'Room')
+    Booking = apps.get_model('apibackendapp', 'Booking')
+    Payment = apps.get_model('apibackendapp', 'Payment')
+    Change = apps.get_model('apibackendapp', 'Change')
+
+    changes = [
+        Change(model='room', object_id=pk, action='created')
+        for pk in Room.objects.order_by('pk').values_list('pk', flat=True)
+    ]
+    changes += [
+        Change(model='booking', object_id=pk, action='created', owner_id=owner_id)
+        for pk, owner_id in Booking.objects.order_by('pk').values_list('pk', 'Gid__User')
+    ]
+    changes += [
+        Change(model='payment', object_id=pk, action='created', owner_id=owner_id)
+        for pk, owner_id in Payment.objects.order_by('pk').values_list('pk', 'Booking__Gid__User')
+    ]
+    Change.objects.bulk_create(changes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apibackendapp', '0002_change_timestamps'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+    ]
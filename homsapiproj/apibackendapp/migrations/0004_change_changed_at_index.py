@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apibackendapp', '0003_backfill_changes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='change',
+            name='changed_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
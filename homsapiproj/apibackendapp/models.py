@@ -1,15 +1,25 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
 # Create your models here.
 
-class Room(models.Model):
+class ChangeTrackedMixin:
+    # The Change row written by the post_save signal (apibackendapp.signals)
+    # must commit together with the row itself. Deletes already run the
+    # signals inside Django's own transaction.
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+class Room(ChangeTrackedMixin, models.Model):
     Rid=models.AutoField(primary_key=True)
     RoomNumber=models.CharField(max_length=100)
     RoomType=models.CharField(max_length=100)
     RoomPrice=models.DecimalField(max_digits=10,decimal_places=2)
     Capacity=models.IntegerField()
     is_available=models.BooleanField(default=True)
+    created_at=models.DateTimeField(auto_now_add=True)
+    updated_at=models.DateTimeField(auto_now=True)
     
 class GuestProfile(models.Model):
     Gid = models.AutoField(primary_key=True)
@@ -17,7 +27,7 @@ class GuestProfile(models.Model):
     phoneno=models.CharField(max_length=15)
     Address=models.TextField()
 
-class Booking(models.Model):
+class Booking(ChangeTrackedMixin, models.Model):
     BookingId = models.AutoField(primary_key=True)
     Rid = models.ForeignKey(Room,on_delete=models.CASCADE)
     Gid = models.ForeignKey(GuestProfile,on_delete=models.CASCADE)
@@ -25,13 +35,26 @@ class Booking(models.Model):
     CheckOutDate = models.DateField()
     TotalAmount = models.DecimalField(max_digits=10,decimal_places=2)
     status = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
-class Payment(models.Model):
+class Payment(ChangeTrackedMixin, models.Model):
     PaymentId = models.AutoField(primary_key=True)
     Booking = models.ForeignKey(Booking,on_delete=models.CASCADE)
     Amount = models.DecimalField(max_digits=10,decimal_places=2)
     PaymentDate = models.DateField()
     PaymentMethod = models.CharField(max_length=100)
     status = models.CharField(max_length=100)
-    
-    
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+class Change(models.Model):
+    # One row per create/update/cancel/delete of a Room, Booking or Payment.
+    # The auto-increment id is the cursor for the changes feed.
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=20)
+    object_id = models.IntegerField()
+    action = models.CharField(max_length=20)
+    # Guest who owns the booking/payment, so guests only see their own changes
+    owner = models.ForeignKey(User,on_delete=models.SET_NULL,null=True,blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True,db_index=True)
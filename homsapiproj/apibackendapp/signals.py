@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from .models import Room, Booking, Payment, Change
+
+# Record every write to the synced models in the Change table,
+# which backs the /api/changes/ feed. Only .save()/.delete() fire these,
+# so bulk queryset updates on these models would not show up in the feed.
+
+CHANGE_MODELS = {Room: 'room', Booking: 'booking', Payment: 'payment'}
+
+
+def get_owner_id(instance):
+    if isinstance(instance, Booking):
+        return instance.Gid.User_id
+    if isinstance(instance, Payment):
+        return instance.Booking.Gid.User_id
+    return None
+
+
+def get_stored_owner_id(instance):
+    # Owner as currently saved in the database, before this save
+    if isinstance(instance, Booking):
+        owners = Booking.objects.filter(pk=instance.pk).values_list('Gid__User', flat=True)
+    else:
+        owners = Payment.objects.filter(pk=instance.pk).values_list('Booking__Gid__User', flat=True)
+    return owners.first()
+
+
+def remember_owner(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._change_previous_owner_id = get_stored_owner_id(instance)
+
+
+def record_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    if created:
+        action = 'created'
+    elif sender is Booking and instance.status == 'Cancelled':
+        action = 'cancelled'
+    else:
+        action = 'updated'
+
+    owner_id = get_owner_id(instance)
+    changes = [Change(model=CHANGE_MODELS[sender], object_id=instance.pk, action=action, owner_id=owner_id)]
+
+    # Moved to another guest: tell the previous one it is gone. A booking
+    # takes its payments along, so those move too.
+    previous_owner_id = getattr(instance, '_change_previous_owner_id', None)
+    if previous_owner_id is not None and previous_owner_id != owner_id:
+        moved = [(CHANGE_MODELS[sender], instance.pk)]
+        if sender is Booking:
+            payment_ids = list(Payment.objects.filter(Booking=instance).values_list('pk', flat=True))
+            moved += [('payment', payment_id) for payment_id in payment_ids]
+            changes += [Change(model='payment', object_id=payment_id, action='updated', owner_id=owner_id)
+                        for payment_id in payment_ids]
+        changes += [Change(model=model, object_id=object_id, action='removed', owner_id=previous_owner_id)
+                    for model, object_id in moved]
+
+    Change.objects.bulk_create(changes)
+
+
+def remember_deleted_owner(sender, instance, origin=None, **kwargs):
+    # When the user itself is being deleted, its Change rows are nulled
+    # anyway and pointing new ones at it would break the foreign key
+    deleting_users = isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User)
+    instance._change_owner_id = None if deleting_users else get_owner_id(instance)
+
+
+def record_delete(sender, instance, **kwargs):
+    Change.objects.create(
+        model=CHANGE_MODELS[sender],
+        object_id=instance.pk,
+        action='deleted',
+        owner_id=getattr(instance, '_change_owner_id', None)
+    )
+
+
+# Connected per model: a delete listener without a sender would stop
+# Django from fast-deleting every other model in the project
+for model in CHANGE_MODELS:
+    post_save.connect(record_save, sender=model)
+    post_delete.connect(record_delete, sender=model)
+for model in (Booking, Payment):
+    pre_save.connect(remember_owner, sender=model)
+    pre_delete.connect(remember_deleted_owner, sender=model)
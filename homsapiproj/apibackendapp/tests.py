@@ -1,3 +1,394 @@
-from django.test import TestCase
+import threading
+from datetime import date, timedelta
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db import DatabaseError
+from django.db.models.deletion import Collector
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import Room, GuestProfile, Booking, Payment, Change
+from .throttling import MemoryBucketStore, HashConcurrencyLimitMixin, get_bucket_store
 
 # Create your tests here.
+
+def auth(user):
+    return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+
+def create_hotel(target):
+    """
+    Two guests with one booking each (the first one paid), plus a staff user.
+    """
+    target.staff = User.objects.create_user('staff', 'staff@example.com', 'password123', is_staff=True)
+    target.guest = User.objects.create_user('guest', 'guest@example.com', 'password123')
+    target.other = User.objects.create_user('other', 'other@example.com', 'password123')
+    target.guest_profile = GuestProfile.objects.create(User=target.guest, phoneno='9999999999', Address='A')
+    target.other_profile = GuestProfile.objects.create(User=target.other, phoneno='8888888888', Address='B')
+
+    target.room = Room.objects.create(RoomNumber='101', RoomType='Single', RoomPrice=100, Capacity=1)
+    target.other_room = Room.objects.create(RoomNumber='102', RoomType='Double', RoomPrice=150, Capacity=2)
+
+    target.check_in = date.today() + timedelta(days=10)
+    target.check_out = target.check_in + timedelta(days=2)
+    target.booking = Booking.objects.create(
+        Rid=target.room, Gid=target.guest_profile, CheckInDate=target.check_in,
+        CheckOutDate=target.check_out, TotalAmount=200, status='Pending'
+    )
+    target.other_booking = Booking.objects.create(
+        Rid=target.other_room, Gid=target.other_profile, CheckInDate=target.check_in,
+        CheckOutDate=target.check_out, TotalAmount=300, status='Pending'
+    )
+    target.payment = Payment.objects.create(
+        Booking=target.booking, Amount=200, PaymentDate=date.today(),
+        PaymentMethod='Card', status='Success'
+    )
+
+
+class HotelTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_hotel(cls)
+
+
+class AsyncViewTests(HotelTestCase):
+    async def test_room_list_and_detail(self):
+        response = await self.async_client.get('/api/async/rooms/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+        response = await self.async_client.get(f'/api/async/rooms/{self.room.pk}/')
+        self.assertEqual(response.json()['RoomNumber'], '101')
+
+        response = await self.async_client.get('/api/async/rooms/999/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_search_matches_sync_endpoint(self):
+        query = f'?check_in={self.check_in}&check_out={self.check_out}'
+        async_response = await self.async_client.get('/api/async/rooms/search/' + query)
+        sync_response = await self.async_client.get('/api/rooms/search/' + query)
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+        # Both rooms are booked for these dates
+        self.assertEqual(async_response.json(), [])
+
+        response = await self.async_client.get('/api/async/rooms/search/')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_my_bookings_requires_auth(self):
+        response = await self.async_client.get('/api/async/bookings/my/')
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get('/api/async/bookings/my/', headers={'Authorization': 'Bearer bad'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_my_listings_only_show_own_rows(self):
+        response = await self.async_client.get('/api/async/bookings/my/', headers=auth(self.guest))
+        self.assertEqual([b['BookingId'] for b in response.json()], [self.booking.pk])
+
+        response = await self.async_client.get('/api/async/payments/my/', headers=auth(self.other))
+        self.assertEqual(response.json(), [])
+
+        response = await self.async_client.get('/api/async/bookings/my/', headers=auth(self.staff))
+        self.assertEqual(len(response.json()), 2)
+
+
+class AuthThrottleTests(HotelTestCase):
+    def setUp(self):
+        # Fresh token buckets for every test
+        get_bucket_store.cache_clear()
+
+    def login(self, username, password='wrong-password', **extra):
+        return self.client.post(
+            '/api/auth/login/', {'username': username, 'password': password},
+            content_type='application/json', **extra
+        )
+
+    def test_login_throttled_per_username_before_hashing(self):
+        with patch('rest_framework_simplejwt.serializers.authenticate', return_value=None) as authenticate:
+            for _ in range(5):
+                self.assertEqual(self.login('guest').status_code, 401)
+            with self.assertNumQueries(0):
+                response = self.login('guest')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(authenticate.call_count, 5)
+
+        # Other usernames still have their own bucket
+        self.assertEqual(self.login('guest', 'password123').status_code, 429)
+        self.assertEqual(self.login('other', 'password123').status_code, 200)
+
+    def test_throttled_register_skips_bearer_user_lookup(self):
+        data = {'username': 'guest', 'password': 'password123', 'email': 'dup@example.com'}
+        for _ in range(5):
+            self.client.post('/api/auth/register/', data, content_type='application/json')
+        # A valid JWT would otherwise cost a user query before the throttles run
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                '/api/auth/register/', data, content_type='application/json', headers=auth(self.guest)
+            )
+        self.assertEqual(response.status_code, 429)
+
+    def test_register_throttled_per_ip_before_hashing(self):
+        with patch('apibackendapp.serializers.make_password', return_value='hash') as make_password:
+            for i in range(20):
+                response = self.client.post('/api/auth/register/', {
+                    'username': f'new{i}', 'password': 'password123', 'email': f'new{i}@example.com'
+                }, content_type='application/json')
+                self.assertEqual(response.status_code, 201)
+            with self.assertNumQueries(0):
+                response = self.client.post('/api/auth/register/', {
+                    'username': 'new20', 'password': 'password123', 'email': 'new20@example.com'
+                }, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(make_password.call_count, 20)
+        self.assertFalse(User.objects.filter(username='new20').exists())
+
+    def test_concurrency_cap_rejects_when_all_slots_busy(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with patch.object(HashConcurrencyLimitMixin, '_hash_slots', slots):
+            self.assertEqual(self.login('guest', 'password123').status_code, 429)
+            slots.release()
+            self.assertEqual(self.login('guest', 'password123').status_code, 200)
+        # The slot is given back after the request
+        self.assertTrue(slots.acquire(blocking=False))
+
+
+    def test_non_api_exception_gives_the_slot_back(self):
+        slots = threading.BoundedSemaphore(1)
+        with patch.object(HashConcurrencyLimitMixin, '_hash_slots', slots), \
+                patch('apibackendapp.views.SignupSerializer.save', side_effect=DatabaseError("down")):
+            with self.assertRaises(DatabaseError):
+                self.client.post('/api/auth/register/', {
+                    'username': 'new', 'password': 'password123', 'email': 'new@example.com'
+                }, content_type='application/json')
+        self.assertTrue(slots.acquire(blocking=False))
+
+    def test_spoofed_forwarded_for_shares_the_ip_bucket(self):
+        with patch('rest_framework_simplejwt.serializers.authenticate', return_value=None):
+            for i in range(20):
+                response = self.login(f'user{i}', HTTP_X_FORWARDED_FOR=f'10.1.0.{i}')
+                self.assertEqual(response.status_code, 401)
+            response = self.login('user20', HTTP_X_FORWARDED_FOR='10.1.0.20')
+        self.assertEqual(response.status_code, 429)
+
+    def test_successful_logins_are_not_charged(self):
+        for _ in range(10):
+            self.assertEqual(self.login('guest', 'password123').status_code, 200)
+
+    def test_failures_from_another_ip_do_not_lock_the_user_out(self):
+        with patch('rest_framework_simplejwt.serializers.authenticate', return_value=None):
+            for _ in range(6):
+                self.login('guest', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(self.login('guest', 'password123', REMOTE_ADDR='10.0.0.2').status_code, 429)
+        self.assertEqual(self.login('guest', 'password123').status_code, 200)
+
+
+class MemoryBucketStoreTests(TestCase):
+    def test_bucket_refills_at_its_rate(self):
+        store = MemoryBucketStore()
+        self.assertEqual([store.consume('k', 2, 1, 0)[0] for _ in range(3)], [True, True, False])
+        self.assertTrue(store.consume('k', 2, 1, 1.0)[0])
+
+    def test_eviction_uses_each_bucket_own_rate(self):
+        store = MemoryBucketStore()
+        for _ in range(20):
+            store.consume('ip', 20, 20 / 60, 0)
+        # A slow bucket inserted later must not refill the drained fast one
+        store.consume('user', 5, 5 / 60, 1)
+        self.assertFalse(store.consume('ip', 20, 20 / 60, 1)[0])
+
+    def test_size_is_capped(self):
+        store = MemoryBucketStore()
+        store.max_entries = 3
+        for i in range(10):
+            store.consume(f'k{i}', 5, 0.001, 0)
+        self.assertEqual(list(store.buckets), ['k7', 'k8', 'k9'])
+
+
+class BatchTests(TransactionTestCase):
+    # Batched reads run on other threads, which only see committed data
+
+    def setUp(self):
+        create_hotel(self)
+
+    def batch(self, requests, user=None):
+        headers = auth(user) if user else {}
+        return self.client.post(
+            '/api/batch/', {'requests': requests}, content_type='application/json', headers=headers
+        )
+
+    def test_dashboard_reads_in_one_request(self):
+        response = self.batch([
+            {'path': '/api/rooms/'},
+            {'path': '/api/bookings/my/'},
+            {'path': '/api/payments/my/'},
+            {'path': f'/api/rooms/{self.room.pk}/'},
+        ], self.guest)
+        self.assertEqual(response.status_code, 200)
+        responses = response.json()['responses']
+        self.assertEqual([r['status'] for r in responses], [200, 200, 200, 200])
+        self.assertEqual(len(responses[0]['body']), 2)
+        self.assertEqual([b['BookingId'] for b in responses[1]['body']], [self.booking.pk])
+        self.assertEqual(responses[3]['body']['RoomNumber'], '101')
+
+    def test_sub_requests_keep_view_permissions(self):
+        responses = self.batch([
+            {'path': f'/api/bookings/{self.other_booking.pk}/'},
+            {'path': f'/api/bookings/{self.other_booking.pk}/cancel/', 'method': 'PUT'},
+            {'path': f'/api/rooms/{self.room.pk}/availability/', 'method': 'PATCH', 'body': {'is_available': False}},
+        ], self.guest).json()['responses']
+        self.assertEqual([r['status'] for r in responses], [404, 404, 403])
+        self.other_booking.refresh_from_db()
+        self.assertEqual(self.other_booking.status, 'Pending')
+
+        responses = self.batch([{'path': '/api/bookings/my/'}]).json()['responses']
+        self.assertEqual(responses[0]['status'], 401)
+
+    def test_reads_after_a_write_see_it(self):
+        responses = self.batch([
+            {'path': f'/api/bookings/{self.booking.pk}/cancel/', 'method': 'PUT'},
+            {'path': f'/api/bookings/{self.booking.pk}/'},
+            {'path': '/api/bookings/my/'},
+        ], self.guest).json()['responses']
+        self.assertEqual(responses[0]['status'], 200)
+        self.assertEqual(responses[1]['body']['status'], 'Cancelled')
+        self.assertEqual(responses[2]['body'][0]['status'], 'Cancelled')
+
+    def test_unknown_and_unbatchable_paths(self):
+        responses = self.batch([
+            {'path': '/api/nope/'},
+            {'path': '/api/batch/', 'method': 'POST'},
+            {'path': '/api/async/rooms/'},
+            {'path': '/admin/'},
+        ], self.guest).json()['responses']
+        self.assertEqual([r['status'] for r in responses], [404, 404, 404, 404])
+
+    def test_failing_sub_request_only_fails_its_entry(self):
+        with patch('apibackendapp.views.RoomViewSet.list', side_effect=DatabaseError("boom")):
+            with self.assertLogs('apibackendapp.batch', 'ERROR'):
+                responses = self.batch([
+                    {'path': '/api/rooms/'},
+                    {'path': '/api/bookings/my/'},
+                ], self.guest).json()['responses']
+        self.assertEqual([r['status'] for r in responses], [500, 200])
+
+    def test_invalid_batches_are_rejected(self):
+        self.assertEqual(self.batch([]).status_code, 400)
+        self.assertEqual(self.batch([{'method': 'GET'}]).status_code, 400)
+        self.assertEqual(self.batch([{'path': '/api/rooms/', 'method': 'TRACE'}]).status_code, 400)
+        self.assertEqual(self.batch([{'path': '/api/rooms/'}] * 21).status_code, 400)
+
+
+@override_settings(CHANGE_FEED_LAG=0)
+class ChangeFeedTests(HotelTestCase):
+    def feed(self, since=0, user=None):
+        headers = auth(user) if user else {}
+        return self.client.get(f'/api/changes/?since={since}', headers=headers).json()
+
+    def summary(self, feed):
+        return [(c['model'], c['id'], c['action']) for c in feed['changes']]
+
+    def test_initial_sync_from_zero(self):
+        feed = self.feed(user=self.staff)
+        self.assertEqual(len(feed['changes']), 5)
+        self.assertFalse(feed['has_more'])
+        self.assertEqual(self.feed(feed['cursor'], self.staff)['changes'], [])
+
+    def test_cancel_and_availability_patch_show_up(self):
+        cursor = self.feed(user=self.guest)['cursor']
+        self.client.put(f'/api/bookings/{self.booking.pk}/cancel/', headers=auth(self.guest))
+        self.client.patch(
+            f'/api/rooms/{self.other_room.pk}/availability/', {'is_available': False},
+            content_type='application/json', headers=auth(self.staff)
+        )
+
+        feed = self.feed(cursor, self.guest)
+        self.assertEqual(self.summary(feed), [
+            ('booking', self.booking.pk, 'cancelled'),
+            ('room', self.other_room.pk, 'updated'),
+        ])
+        self.assertEqual(feed['changes'][0]['data']['status'], 'Cancelled')
+        self.assertFalse(feed['changes'][1]['data']['is_available'])
+
+    def test_guests_only_see_their_own_rows(self):
+        rooms = [('room', self.room.pk, 'created'), ('room', self.other_room.pk, 'created')]
+        self.assertEqual(self.summary(self.feed()), rooms)
+        self.assertEqual(self.summary(self.feed(user=self.other)), rooms + [
+            ('booking', self.other_booking.pk, 'created'),
+        ])
+
+    def test_reassigned_booking_does_not_leak(self):
+        cursor = self.feed(user=self.guest)['cursor']
+        self.booking.Gid = self.other_profile
+        self.booking.save()
+
+        # Syncing from before the move or after it, the old guest only learns it is gone
+        for since in (0, cursor):
+            changes = [c for c in self.feed(since, self.guest)['changes'] if c['model'] != 'room']
+            self.assertEqual([(c['model'], c['id'], c['action'], c['data']) for c in changes], [
+                ('booking', self.booking.pk, 'removed', None),
+                ('payment', self.payment.pk, 'removed', None),
+            ])
+
+        feed = self.feed(cursor, self.other)
+        self.assertEqual(self.summary(feed), [
+            ('booking', self.booking.pk, 'updated'),
+            ('payment', self.payment.pk, 'updated'),
+        ])
+
+    def test_owner_sees_deletions(self):
+        cursor = self.feed(user=self.guest)['cursor']
+        self.client.delete(f'/api/bookings/{self.booking.pk}/', headers=auth(self.guest))
+        self.assertEqual(self.summary(self.feed(cursor, self.guest)), [
+            ('payment', self.payment.pk, 'deleted'),
+            ('booking', self.booking.pk, 'deleted'),
+        ])
+        self.assertEqual(self.feed(cursor, self.other)['changes'], [])
+
+    def test_deleting_a_user_still_records_deletions(self):
+        cursor = self.feed(user=self.staff)['cursor']
+        self.guest.delete()
+        self.assertEqual(self.summary(self.feed(cursor, self.staff)), [
+            ('payment', self.payment.pk, 'deleted'),
+            ('booking', self.booking.pk, 'deleted'),
+        ])
+
+    def test_change_record_commits_with_the_row(self):
+        self.booking.status = 'Confirmed'
+        with patch.object(Change.objects, 'bulk_create', side_effect=DatabaseError("boom")):
+            with self.assertRaises(DatabaseError):
+                self.booking.save()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'Pending')
+
+    def test_other_models_keep_fast_deletes(self):
+        collector = Collector('default')
+        self.assertTrue(collector.can_fast_delete(Session.objects.all()))
+
+
+class ChangeFeedLagTests(HotelTestCase):
+    def feed(self, since=0):
+        return self.client.get(f'/api/changes/?since={since}', headers=auth(self.staff)).json()
+
+    def test_recent_changes_wait_for_the_lag(self):
+        feed = self.feed()
+        self.assertEqual((feed['changes'], feed['cursor']), ([], 0))
+
+        with patch('apibackendapp.views.timezone.now', return_value=timezone.now() + timedelta(seconds=10)):
+            self.assertEqual(len(self.feed()['changes']), 5)
+
+    def test_cursor_stops_before_the_first_recent_change(self):
+        Change.objects.update(changed_at=timezone.now() - timedelta(minutes=1))
+        old_cursor = Change.objects.order_by('-id').first().id
+        self.room.save()
+
+        feed = self.feed()
+        self.assertEqual(len(feed['changes']), 5)
+        self.assertEqual(feed['cursor'], old_cursor)
+
+        # Served once it is old enough
+        Change.objects.filter(id__gt=old_cursor).update(changed_at=timezone.now() - timedelta(minutes=1))
+        feed = self.feed(old_cursor)
+        self.assertEqual([(c['model'], c['id']) for c in feed['changes']], [('room', self.room.pk)])
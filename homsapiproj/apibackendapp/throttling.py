@@ -0,0 +1,199 @@
+import functools
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import SimpleRateThrottle
+
+# Throttling for the auth endpoints. Login and register run a deliberately
+# slow password hash, so limited requests must be rejected here, before the
+# view does any hashing or DB work.
+
+
+class MemoryBucketStore:
+    """
+    Token buckets kept in this process's memory.
+    Fast and exact, but every worker process has its own buckets.
+    Holds at most max_entries buckets, dropping the least recently used.
+    """
+    max_entries = 10000
+
+    def __init__(self):
+        # key -> (tokens, updated, capacity, refill_rate), oldest first
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate, now):
+        with self.lock:
+            entry = self.buckets.pop(key, None)
+            if entry is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, entry[0] + (now - entry[1]) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now, capacity, refill_rate)
+            self.evict(now)
+        return allowed, tokens
+
+    def peek(self, key, capacity, refill_rate, now):
+        with self.lock:
+            entry = self.buckets.get(key)
+        if entry is None:
+            return capacity
+        return min(capacity, entry[0] + (now - entry[1]) * refill_rate)
+
+    def evict(self, now):
+        # Buckets that are full again by their own rate are the same as
+        # missing ones, so drop those from the old end first
+        while self.buckets:
+            tokens, updated, capacity, refill_rate = next(iter(self.buckets.values()))
+            if tokens + (now - updated) * refill_rate < capacity:
+                break
+            self.buckets.popitem(last=False)
+        while len(self.buckets) > self.max_entries:
+            self.buckets.popitem(last=False)
+
+
+class CacheBucketStore:
+    """
+    Token buckets kept in the Django cache, so they are shared between
+    worker processes when the cache is memcached or redis.
+    The read-modify-write is not atomic; concurrent requests may
+    occasionally both take the last token.
+    """
+
+    def consume(self, key, capacity, refill_rate, now):
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Keep the entry until the bucket would be full again
+        cache.set(key, (tokens, now), int((capacity - tokens) / refill_rate) + 1)
+        return allowed, tokens
+
+    def peek(self, key, capacity, refill_rate, now):
+        tokens, updated = cache.get(key, (capacity, now))
+        return min(capacity, tokens + (now - updated) * refill_rate)
+
+
+@functools.cache
+def get_bucket_store():
+    return import_string(settings.THROTTLE_BUCKET_BACKEND)()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket version of SimpleRateThrottle.
+    A rate of '5/min' allows a burst of 5 requests, then one more every 12s.
+    With charge_failures_only, a request only needs a token to be left;
+    FailedAttemptThrottleMixin takes it once the attempt has failed.
+    """
+    cache_format = 'token_bucket_%(scope)s_%(ident)s'
+    charge_failures_only = False
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.refill_rate = self.num_requests / self.duration
+        if self.charge_failures_only:
+            self.tokens = get_bucket_store().peek(
+                self.key, self.num_requests, self.refill_rate, self.timer()
+            )
+            if self.tokens < 1:
+                return False
+            view.failure_throttles.append(self)
+            return True
+
+        allowed, self.tokens = get_bucket_store().consume(
+            self.key, self.num_requests, self.refill_rate, self.timer()
+        )
+        return allowed
+
+    def charge(self):
+        get_bucket_store().consume(self.key, self.num_requests, self.refill_rate, self.timer())
+
+    def wait(self):
+        return (1 - self.tokens) / self.refill_rate
+
+
+class AuthIPRateThrottle(TokenBucketThrottle):
+    """
+    Limits login/register attempts per client IP.
+    get_ident() only trusts X-Forwarded-For as far as REST_FRAMEWORK['NUM_PROXIES'] allows.
+    """
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class AuthUsernameRateThrottle(TokenBucketThrottle):
+    """
+    Limits failed login/register attempts per username from one IP.
+    Keyed on the IP as well, so nobody can lock another user out,
+    and successful logins cost nothing.
+    """
+    scope = 'auth_username'
+    charge_failures_only = True
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username')
+        if not username or not isinstance(username, str):
+            return None
+        ident = f'{self.get_ident(request)}_{username.lower()}'
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class FailedAttemptThrottleMixin:
+    """
+    Charges throttles with charge_failures_only once the request has
+    failed (400/401), e.g. a wrong password.
+    """
+    failed_status_codes = (400, 401)
+
+    def initial(self, request, *args, **kwargs):
+        self.failure_throttles = []
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if response.status_code in self.failed_status_codes:
+            for throttle in getattr(self, 'failure_throttles', []):
+                throttle.charge()
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class HashConcurrencyLimitMixin:
+    """
+    Caps how many requests of a password-hashing view run at once in this
+    process. Requests over the cap get a 429 instead of queueing for CPU.
+    """
+    _hash_slots = threading.BoundedSemaphore(settings.AUTH_HASH_CONCURRENCY)
+
+    def initial(self, request, *args, **kwargs):
+        # Runs authentication, permissions and throttles first
+        super().initial(request, *args, **kwargs)
+        if not self._hash_slots.acquire(blocking=False):
+            raise Throttled(detail="Too many concurrent authentication requests, please retry shortly.")
+        self.holds_hash_slot = True
+
+    def dispatch(self, request, *args, **kwargs):
+        # Released here rather than in finalize_response, which DRF skips
+        # when the view raises a non-API exception (e.g. a DatabaseError)
+        self.holds_hash_slot = False
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self.holds_hash_slot:
+                self.holds_hash_slot = False
+                self._hash_slots.release()
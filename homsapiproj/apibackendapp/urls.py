@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     RoomViewSet, GuestProfileViewSet, BookingViewSet, 
-    PaymentViewSet, RegisterView
+    PaymentViewSet, RegisterView, LoginView, BatchView, ChangeFeedView
 )
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'rooms', RoomViewSet)
@@ -15,6 +16,15 @@ router.register(r'payments', PaymentViewSet, basename='payment')
 urlpatterns = [
     path('', include(router.urls)),
     path('auth/register/', RegisterView.as_view(), name='register'),
-    path('auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('auth/login/', LoginView.as_view(), name='token_obtain_pair'),
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    path('changes/', ChangeFeedView.as_view(), name='changes'),
+
+    # Async read endpoints (serve with ASGI)
+    path('async/rooms/', async_views.room_list, name='async-room-list'),
+    path('async/rooms/search/', async_views.room_availability_search, name='async-room-search'),
+    path('async/rooms/<int:pk>/', async_views.room_detail, name='async-room-detail'),
+    path('async/bookings/my/', async_views.my_bookings, name='async-booking-my'),
+    path('async/payments/my/', async_views.my_payments, name='async-payment-my'),
 ]
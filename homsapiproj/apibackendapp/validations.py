@@ -1,7 +1,7 @@
 import re
 from datetime import date
 from rest_framework.exceptions import ValidationError
-from .models import Booking
+from .models import Room, Booking
 
 def validate_dates(check_in, check_out):
     if check_in >= check_out:
@@ -25,6 +25,24 @@ def validate_room_availability(room, check_in, check_out):
     if overlapping_bookings.exists():
         raise ValidationError("Room is already booked for these dates.")
 
+def parse_search_dates(params):
+    try:
+        check_in = date.fromisoformat(params.get('check_in', ''))
+        check_out = date.fromisoformat(params.get('check_out', ''))
+    except ValueError:
+        raise ValidationError("check_in and check_out are required in YYYY-MM-DD format.")
+    validate_dates(check_in, check_out)
+    return check_in, check_out
+
+def get_available_rooms(check_in, check_out):
+    # Same overlap rule as validate_room_availability(), as a single query
+    booked_rooms = Booking.objects.filter(
+        status__in=['Confirmed', 'Pending'],
+        CheckInDate__lt=check_out,
+        CheckOutDate__gt=check_in
+    ).values('Rid')
+    return Room.objects.filter(is_available=True).exclude(Rid__in=booked_rooms)
+
 def validate_payment_amount(booking, amount):
     if amount != booking.TotalAmount:
         raise ValidationError(f"Payment amount ({amount}) does not match booking total ({booking.TotalAmount}).")
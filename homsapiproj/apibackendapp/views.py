@@ -4,14 +4,23 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.db.models import Q
-from .models import Room, GuestProfile, Booking, Payment
+from django.utils import timezone
+from .models import Room, GuestProfile, Booking, Payment, Change
 from .serializers import (
     RoomSerializer, GuestProfileSerializer, BookingSerializer, 
     PaymentSerializer, SignupSerializer
 )
 from .permissions import IsStaffOrReadOnly, IsBookingOwnerOrStaff, IsPaymentOwnerOrStaff
-from datetime import datetime
+from .validations import parse_search_dates, get_available_rooms
+from .batch import validate_batch, run_batch
+from .throttling import (
+    AuthIPRateThrottle, AuthUsernameRateThrottle,
+    FailedAttemptThrottleMixin, HashConcurrencyLimitMixin
+)
+from datetime import datetime, timedelta
 
 # Create your views here.
 
@@ -31,6 +40,12 @@ class RoomViewSet(viewsets.ModelViewSet):
         room.save()
         return Response(RoomSerializer(room).data)
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        check_in, check_out = parse_search_dates(request.query_params)
+        rooms = get_available_rooms(check_in, check_out)
+        return Response(RoomSerializer(rooms, many=True).data)
+
 class GuestProfileViewSet(viewsets.ModelViewSet):
     queryset = GuestProfile.objects.all()
     serializer_class = GuestProfileSerializer
@@ -125,7 +140,12 @@ class PaymentViewSet(viewsets.ModelViewSet):
             booking.save()
         serializer.save(status='Success')
 
-class RegisterView(APIView):
+class RegisterView(HashConcurrencyLimitMixin, FailedAttemptThrottleMixin, APIView):
+    # No authentication: a Bearer header would cost a user lookup before the throttles
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [AuthIPRateThrottle, AuthUsernameRateThrottle]
+
     def post(self, request):
         serializer = SignupSerializer(data=request.data)
         if serializer.is_valid():
@@ -133,3 +153,111 @@ class RegisterView(APIView):
             user = serializer.save()
             return Response({"message": "User registered successfully"}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class LoginView(HashConcurrencyLimitMixin, FailedAttemptThrottleMixin, TokenObtainPairView):
+    # Throttled before the serializer checks the password hash
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [AuthIPRateThrottle, AuthUsernameRateThrottle]
+
+class BatchView(APIView):
+    """
+    Runs several API requests in one round-trip.
+    POST {"requests": [{"method": "GET", "path": "/api/rooms/"}, ...]}
+    returns {"responses": [{"status": 200, "body": [...]}, ...]} in the same order.
+    """
+    # Each sub-request is checked by its own view's permission classes
+    permission_classes = [permissions.AllowAny]
+    batchable = False
+
+    def post(self, request):
+        sub_requests = validate_batch(request.data)
+        return Response({"responses": run_batch(request, sub_requests)})
+
+class ChangeFeedView(APIView):
+    """
+    Incremental sync for rooms, bookings and payments.
+    GET /api/changes/?since=<cursor> returns the rows created, updated,
+    cancelled or deleted after the cursor; pass the returned cursor as
+    `since` on the next call (start with 0). A booking or payment that
+    moved to another guest shows up as 'removed' for the previous one.
+    Changes are only served once they are CHANGE_FEED_LAG seconds old.
+    """
+    permission_classes = [permissions.AllowAny]
+    page_size = 500
+    feed_models = {
+        'room': (Room.objects.all(), RoomSerializer),
+        'booking': (Booking.objects.select_related('Rid', 'Gid'), BookingSerializer),
+        'payment': (Payment.objects.select_related('Booking__Rid', 'Booking__Gid'), PaymentSerializer),
+    }
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get('since', 0))
+        except ValueError:
+            raise ValidationError("since must be a cursor returned by this endpoint.")
+
+        changes = Change.objects.filter(id__gt=since).order_by('id')
+
+        # Ids are taken at insert, not at commit: a transaction still in flight
+        # (e.g. a cascade delete) can commit a lower id after a client has read
+        # past it. So stop before the first change younger than CHANGE_FEED_LAG.
+        cutoff = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_LAG)
+        first_recent = changes.filter(changed_at__gte=cutoff).values_list('id', flat=True).first()
+        if first_recent is not None:
+            changes = changes.filter(id__lt=first_recent)
+
+        user = request.user
+        if not user.is_staff:
+            # Rooms are public, bookings and payments only for their guest
+            visible = Q(model='room')
+            if user.is_authenticated:
+                visible |= Q(owner=user)
+            changes = changes.filter(visible)
+
+        changes = list(changes[:self.page_size + 1])
+        has_more = len(changes) > self.page_size
+        changes = changes[:self.page_size]
+
+        # Only the latest change per row matters, rows are sent in their current state
+        latest = {}
+        for change in changes:
+            latest[(change.model, change.object_id)] = change
+
+        data = {}
+        for model, (queryset, serializer_class) in self.feed_models.items():
+            ids = [object_id for (name, object_id), change in latest.items()
+                   if name == model and change.action not in ('deleted', 'removed')]
+            if ids:
+                for obj in self.visible_rows(queryset, model, user).filter(pk__in=ids):
+                    data[(model, obj.pk)] = serializer_class(obj).data
+
+        results = []
+        for change in sorted(latest.values(), key=lambda change: change.id):
+            row = data.get((change.model, change.object_id))
+            action = change.action
+            if row is None and action not in ('deleted', 'removed'):
+                # Deleted since, or no longer this guest's
+                action = 'removed'
+            results.append({
+                "cursor": change.id,
+                "model": change.model,
+                "id": change.object_id,
+                "action": action,
+                "data": row,
+            })
+        return Response({
+            "cursor": changes[-1].id if changes else since,
+            "has_more": has_more,
+            "changes": results,
+        })
+
+    def visible_rows(self, queryset, model, user):
+        # Ownership is checked on the current row, not on the recorded change
+        if user.is_staff or model == 'room':
+            return queryset
+        if not user.is_authenticated:
+            return queryset.none()
+        if model == 'booking':
+            return queryset.filter(Gid__User=user)
+        return queryset.filter(Booking__Gid__User=user)
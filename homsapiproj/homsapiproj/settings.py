@@ -85,7 +85,10 @@ DATABASES = {
         'USER':'root',
         'PASSWORD':'Password@123',
         'HOST':'localhost',
-        'PORT':3306
+        'PORT':3306,
+        # Keep connections open between requests (and in the batch thread pool)
+        'CONN_MAX_AGE':60,
+        'CONN_HEALTH_CHECKS':True
     }
 }
 
@@ -142,8 +145,33 @@ REST_FRAMEWORK = {
         #'rest_fframework.permission.Isauthenticated',
         'rest_framework.permissions.AllowAny'
     },
+    # Reverse proxies in front of the app; X-Forwarded-For is only trusted
+    # this far, so clients cannot pick their own throttling IP
+    'NUM_PROXIES': 0,
+    'DEFAULT_THROTTLE_RATES': {
+        # Token buckets for login/register (apibackendapp.throttling)
+        'auth_ip': '20/min',
+        'auth_username': '5/min',
+    },
 }
 
+# Where the auth token buckets live: MemoryBucketStore (per process) or
+# CacheBucketStore (shared through CACHES, e.g. redis/memcached)
+THROTTLE_BUCKET_BACKEND = 'apibackendapp.throttling.MemoryBucketStore'
+
+# Max login/register requests hashing passwords at once, per process
+AUTH_HASH_CONCURRENCY = 4
+
+# /api/batch/: max sub-requests per batch, concurrent reads per batch,
+# and the per-process thread pool those reads share
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+BATCH_POOL_SIZE = 32
+
+# /api/changes/ only serves changes at least this many seconds old, so
+# transactions that were still open when a client polled are not skipped
+CHANGE_FEED_LAG = 5
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),